@@ -2,14 +2,23 @@
 
 import logging
 import argparse
+import functools
+import gzip
+import hashlib
+import json
+import os
 import re
 import sys
-import pickle
 import textwrap
-from typing import Tuple, List, Optional
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, TextIO, Tuple, List, Optional
 
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Note: The MGP site appears to have a problem with its certificate that triggers SSL exceptions in requests.
 # Since security/privacy is not, in the author's opinion, a significant concern for this application,
@@ -22,7 +31,40 @@ logging.basicConfig(level=logging.INFO,
                     datefmt="%m/%d/%Y %I:%M:%S %p")
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
-GRAPH_FORMAT_STRING = "digraph G{\n node[width = 0.5 fontname=Courier shape=rectangle]\n %s}"
+GRAPH_HEADER = "digraph G{\n node[width = 0.5 fontname=Courier shape=rectangle]\n "
+GRAPH_FOOTER = "}"
+
+RE_TITLE = re.compile(r"<title>(.+) - The Mathematics Genealogy Project</title>")
+RE_SPAN_TITLE = re.compile(r'<span style="margin-right: 0.5em">(.+)<span style=')
+RE_INST_YEAR = re.compile(r'margin-left: 0.5em">(.+)</span>(.+)</span>')
+RE_ADVISOR_ID = re.compile(r"id\.php\?id=(\d+)")
+RE_SEARCH_ROW = re.compile(r'<tr><td><a href="id\.php\?id=(\d+)">(.+?)</a></td>')
+
+# Upper bound on the number of record pages fetched from the MGP at the same time.
+MAX_WORKERS = 32
+
+# Seconds to wait for the MGP to accept a connection, or to send more of a response.
+REQUEST_TIMEOUT = 10
+
+# Upper bound on the rate at which new requests are sent to the MGP, across all workers.
+MAX_REQUESTS_PER_SECOND = 20
+
+# Every request goes to the same host, so a single pooled session lets the
+# crawl reuse keep-alive connections instead of paying a TLS handshake per page.
+# Throttling responses and transient server errors are retried with exponential
+# backoff (honoring Retry-After), since both lookups and record pages are read-only.
+# Once the retries run out, the request raises RetryError (a RequestException);
+# crawl and fetch_id_num log it and give up on that one record or name only.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS,
+                                      max_retries=Retry(total=5, backoff_factor=0.5,
+                                                        status_forcelist=(429, 500, 502, 503, 504),
+                                                        allowed_methods=("GET", "POST"))))
+
+# Fetched record pages and name search results are kept here, gzipped, so that
+# re-running a scrape (e.g. with more generations) only downloads what it has
+# not seen before.
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mgptree")
 
 
 def build_opt_parser():
@@ -36,6 +78,12 @@ def build_opt_parser():
                         help="Determines how many generations into the past to search/print.")
     parser.add_argument("--input", "-i", dest="input_file", default=None)
     parser.add_argument("--output", "-o", dest="output_file", default=None)
+    parser.add_argument("--no-cache", dest="cache_on", action="store_false",
+                        default=True, help="Neither read nor write the local cache of MGP pages.")
+    parser.add_argument("--refresh", dest="refresh_on", action="store_true",
+                        default=False, help="Re-download cached MGP pages and update the cache.")
+    parser.add_argument("--jobs", "-j", dest="jobs", type=int, default=1,
+                        help="Number of processes used to format the dotfile when plotting.")
 
     return parser
 
@@ -46,13 +94,17 @@ def main():  # pylint: disable=missing-docstring
 
     if args.scrape_on:
         names = validate_scrape(parser, args)
-        nodes = scrape(names, int(args.gen_depth))
-        pickle_graph_ds(nodes, args.output_file)
+        cache_dir = CACHE_DIR if args.cache_on else None
+        try:
+            nodes = scrape(names, int(args.gen_depth), cache_dir, args.refresh_on)
+        finally:
+            SESSION.close()
+        save_graph_ds(nodes, args.output_file)
 
     elif args.graph_on:
         nodes = validate_graph(parser, args)
-        nodes_txt = graph(nodes, int(args.gen_depth))
-        write_graph_text(nodes_txt, args.output_file)
+        node_fragments = graph(nodes, int(args.gen_depth), args.jobs)
+        write_graph_text(node_fragments, args.output_file)
 
     else:
         sys.stderr.write("Error: You must select either -s or -p.\n")
@@ -70,71 +122,137 @@ def validate_scrape(parser, options):
         parser.print_help()
         sys.exit(1)
     try:
-        namefile = open(options.input_file, "rb")
+        with open(options.input_file, encoding="utf8") as namefile:
+            text = namefile.read()
     except IOError:
-        sys.stderr.write("Error: Input file %s does not exist.\n" % options.names_file)
+        sys.stderr.write("Error: Input file %s does not exist.\n" % options.input_file)
         parser.print_help()
         sys.exit(1)
 
-    text = namefile.read().decode("utf8")
-    names = [parse_name(line) for line in text.split("\n") if len(line) > 0]
-    namefile.close()
-
-    return names
+    # Repeated names would only repeat the same lookup, so keep the first of each.
+    return list(dict.fromkeys(parse_name(line) for line in text.split("\n") if len(line) > 0))
 
 
+@functools.lru_cache(maxsize=4096)
 def parse_name(name_line: str) -> Tuple[str, str, str]:
     """Normalize a name string to a name tuple."""
 
-    if "," in name_line:
-        comma = name_line.index(",")
-        last = (name_line[0:comma]).strip().lower()
-        name_line = (name_line[comma:]).replace(",", "")
-        names = [last] + [name.strip().lower() for name in name_line.split()]
-
+    last, comma, given = name_line.partition(",")
+    if comma:
+        names = [last.strip().lower()] + given.replace(",", "").lower().split()
     else:
-        name_line = name_line.replace(",", "")
-        names = [name.strip().lower() for name in name_line.split()]
+        names = name_line.lower().split()
 
-    if len(names) == 2:
-        return names[0], names[1], ""
-    if len(names) >= 3:
-        return names[0], names[1], names[2]
-    else:
+    if len(names) < 2:
         sys.stderr.write(("Error: Only detected a single name in string %s. " +
                           "Please provide a first and last name.\n") % name_line)
         sys.exit(1)
 
+    return names[0], names[1], names[2] if len(names) > 2 else ""
 
-def scrape(names: List[Tuple[str, str, str]], gens: int) -> dict:
+
+def scrape(names: List[Tuple[str, str, str]], gens: int,
+           cache_dir: Optional[str] = CACHE_DIR, refresh: bool = False) -> dict:
     """Scrape N generations of records from the MGP website.
 
     Arguments:
     names - A list of name tuples.
     gens - An integer number of generations to search back from the initial names.
+    cache_dir - Directory of cached record pages, or None to disable caching.
+    refresh - If true, re-download pages even when they are cached.
 
     Returns:
     A dictionary mapping MGP primary keys to node objects.
     """
-    node_dict = {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # Name lookups are independent of one another, so resolve them all at once.
+        mgp_ids = executor.map(lambda name: fetch_id_num(*name, cache_dir, refresh), names)
+        seeds = {mgp_id for mgp_id in mgp_ids if mgp_id is not None}
 
-    for name in names:
-        mgp_id = fetch_id_num(*name)
-        if mgp_id is None:
-            continue
-        Node(mgp_id, 0, gens, node_dict)
+        fetch = functools.partial(fetch_page, cache_dir=cache_dir, refresh=refresh)
+        return crawl(seeds, gens, executor, fetch)
+
+
+def crawl(seed_ids: Iterable[int], max_gen: int, executor: Executor,
+          fetch: Callable[[int], str]) -> dict:
+    """Fetch the records for the seed ids and their ancestors, breadth first.
+
+    Each generation is fetched as a single batch on the executor, then
+    advisor links are wired up once every record has been collected.
+
+    Arguments:
+    seed_ids - MGP primary keys of generation 0.
+    max_gen - The last generation whose records are fetched.
+    executor - Runs the page fetches for a generation concurrently.
+    fetch - Returns the record page text for an MGP primary key. If it raises
+            a requests exception, the record is kept empty and the crawl goes on.
+
+    Returns:
+    A dictionary mapping MGP primary keys to node objects.
+    """
+    node_dict = {}
+    pending_advisors = {}
+    frontier = sorted(set(seed_ids))
+
+    def fetch_or_none(id_num):
+        try:
+            return fetch(id_num)
+        except requests.RequestException as error:
+            logger.error("Failed to fetch record. id=%s, error=%s", id_num, error)
+            return None
+
+    for gen in range(max_gen + 1):
+        if not frontier:
+            break
+
+        next_frontier = set()
+        for id_num, text in zip(frontier, executor.map(fetch_or_none, frontier)):
+            node = Node(id_num, gen)
+            node_dict[id_num] = node
+            if text is None:
+                # Keep an empty record so its advisees still link to it. Nothing
+                # was cached, so the next scrape tries this page again.
+                continue
+
+            node.extract_personal_data(text)
+            logger.info("Recovered record: %s %s %s %s",
+                        node.name, node.title, node.institution, node.year_of_doctorate)
+
+            if gen < max_gen:
+                pending_advisors[id_num] = node.extract_advisor_ids(text)
+                next_frontier.update(pending_advisors[id_num])
+
+        frontier = sorted(next_frontier.difference(node_dict))
+
+    for id_num, advs in pending_advisors.items():
+        for adv in advs:
+            node_dict[id_num].advised_by(node_dict[adv])
 
     return node_dict
 
 
-def pickle_graph_ds(nodes: dict, filename: str):
-    """Persist a dictionary of tree nodes to disk."""
+def save_graph_ds(nodes: dict, filename: str):
+    """Persist a dictionary of tree nodes to disk, as gzipped JSON."""
     if filename is None:
         filename = "database.mgp"
-    pickle.dump(nodes, open(filename, "wb"))
+    records = [node.to_dict() for node in nodes.values()]
+    with gzip.open(filename, "wt", encoding="utf8", compresslevel=3) as outfile:
+        json.dump(records, outfile, ensure_ascii=False, separators=(",", ":"))
     sys.stdout.write("Saved %d records to file %s.\n" % (len(nodes), filename))
 
 
+def load_graph_ds(filename: str) -> dict:
+    """Load a dictionary of tree nodes saved by save_graph_ds."""
+    with gzip.open(filename, "rt", encoding="utf8") as infile:
+        records = json.load(infile)
+
+    nodes = {}
+    for record in records:
+        node = Node.from_dict(record)
+        nodes[node.id_num] = node
+    return nodes
+
+
 def validate_graph(parser, options) -> dict:
     """Consume and validate user input options for graphing."""
     if options.input_file is None:
@@ -143,61 +261,132 @@ def validate_graph(parser, options) -> dict:
         sys.exit(1)
 
     try:
-        nodes = pickle.load(open(options.input_file, "rb"))
-    except IOError:
-        sys.stderr.write("Error: Could not read file %s.", options.input_file)
+        nodes = load_graph_ds(options.input_file)
+    except (IOError, EOFError, ValueError, KeyError, TypeError):
+        sys.stderr.write("Error: Could not read file %s.\n" % options.input_file)
         parser.print_help()
         sys.exit(1)
 
     return nodes
 
 
-def graph(nodes, gen_depth):
-    """Emit dot code for nodes below a certain generation."""
-    node_strings = set()
-    for _, node in nodes.items():
-        if node.gen <= gen_depth:
-            node_strings.add(node.dot_string(node.gen != gen_depth))
-    return "".join(node_strings)
+def graph(nodes, gen_depth, jobs=1) -> Iterator[str]:
+    """Emit dot code for nodes below a certain generation, one node at a time.
+
+    With jobs > 1 the nodes are formatted in that many worker processes,
+    which pays off for databases of many thousands of records.
+    """
+    selected = [node for node in nodes.values() if node.gen <= gen_depth]
+    print_advs = [node.gen != gen_depth for node in selected]
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            yield from executor.map(render_dot_string, selected, print_advs, chunksize=500)
+    else:
+        yield from map(render_dot_string, selected, print_advs)
+
 
+def render_dot_string(node, print_advs):
+    """Emit the dot description of one node (module level, so worker processes can run it)."""
+    return node.dot_string(print_advs)
 
-def write_graph_text(node_text, filename):
-    """Emit a complete dotfile to disk or stdout."""
 
-    fulltext = GRAPH_FORMAT_STRING % node_text
+def write_graph_text(node_fragments: Iterable[str], filename):
+    """Emit a complete dotfile to disk or stdout.
+
+    Fragments are written as they are produced, so the dotfile is never
+    held in memory as a whole. A filename ending in .gz is gzip-compressed
+    on the fly.
+    """
     if filename is None:
-        sys.stdout.write(fulltext)
+        write_dot(node_fragments, sys.stdout)
     else:
-        outfile = open(filename, "wb")
-        outfile.write(fulltext.encode("utf8"))
-        outfile.close()
+        opener = gzip.open if filename.endswith(".gz") else open
+        with opener(filename, "wt", encoding="utf8", newline="") as outfile:
+            write_dot(node_fragments, outfile)
+
+
+def write_dot(node_fragments: Iterable[str], outfile: TextIO):
+    """Wrap the node fragments in a digraph and write them to an open text file."""
+    outfile.write(GRAPH_HEADER)
+    for fragment in node_fragments:
+        outfile.write(fragment)
+    outfile.write(GRAPH_FOOTER)
+
+
+class RateLimiter:
+    """Space out calls to wait() so that at most `rate` of them return per second.
+
+    The limiter is shared by every worker thread, so it bounds the request
+    rate of the whole scrape rather than of each worker.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller may send its next request."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
 
 
-def same_name(name1: Tuple[str, str, str], name2: Tuple[str, str, str]):
-    """Test if two name tuples are equivalent."""
-    last1 = name1[0].lower()
-    last2 = name2[0].lower()
-    first1 = name1[1].lower()
-    first2 = name2[1].lower()
-    return last1 == last2 and first1 == first2
+RATE_LIMITER = RateLimiter(MAX_REQUESTS_PER_SECOND)
 
 
-def fetch_id_num(last: str, first: str, middle: str) -> Optional[int]:
-    """Attempt to determine the MGP primary key for the input name."""
+def fetch_id_num(last: str, first: str, middle: str,
+                 cache_dir: Optional[str] = None, refresh: bool = False) -> Optional[int]:
+    """Attempt to determine the MGP primary key for the input name.
+
+    The search result page is cached like record pages are; see fetch_page.
+    """
     logger.info("Searching MGP for primary key. last=%s, first=%s, middle=%s", last, first, middle)
 
     url = "https://genealogy.math.ndsu.nodak.edu/query-prep.php"
-    values = {
+    values = build_query(last, first, middle)
+
+    def download():
+        RATE_LIMITER.wait()
+        response = SESSION.post(url, values, verify=False, timeout=REQUEST_TIMEOUT)
+        # Raise on error pages so they are never cached as search results.
+        response.raise_for_status()
+        return response.text
+
+    key = hashlib.sha1(json.dumps(values, sort_keys=True).encode("utf8")).hexdigest()
+    try:
+        text = fetch_cached(cache_path(cache_dir, "query-%s.html.gz" % key), refresh, download)
+    except requests.RequestException as error:
+        logger.error("Failed to search MGP for name. last=%s, first=%s middle=%s, error=%s",
+                     last, first, middle, error)
+        return None
+
+    return parse_id_response(text, last, first, middle)
+
+
+def build_query(last: str, first: str, middle: str) -> dict:
+    """Construct the MGP search form fields for the input name."""
+    return {
         "given_name": first,
         "family_name": last,
         "other_names": middle
     }
 
-    text = (requests.post(url, values, verify=False)).text
 
-    matches = re.findall(r'<tr><td><a href="id.php\?id=(\d+)">(.+)</a></td>', text)
-    pairs = [(int(pair[0]), parse_name(pair[1])) for pair in matches]
-    ids = [p[0] for p in pairs if same_name(p[1], (last, first, middle))]
+def parse_id_response(text: str, last: str, first: str, middle: str) -> Optional[int]:
+    """Pick the MGP primary key matching the input name out of a search result page."""
+    # Only rows mentioning both names can match, so skip parsing the others.
+    needle_last, needle_first = last.lower(), first.lower()
+    candidates = [(id_string, row_name) for id_string, row_name in RE_SEARCH_ROW.findall(text)
+                  if needle_last in row_name.lower() and needle_first in row_name.lower()]
+    pairs = [(int(id_string), parse_name(row_name)) for id_string, row_name in candidates]
+    # parse_name lower-cases its output, so one compare against the normalized query suffices.
+    ids = [id_num for id_num, name in pairs
+           if name[0] == needle_last and name[1] == needle_first]
 
     if not ids:
         logger.error("Unable to find a ID for name. last=%s, first=%s middle=%s",
@@ -209,11 +398,102 @@ def fetch_id_num(last: str, first: str, middle: str) -> Optional[int]:
                      last, first, middle)
         return None
 
-    logging.info("Found ID for name. last=%s, first=%s, middle=%s, id=%d",
-                 last, first, middle, ids[0])
+    logger.info("Found ID for name. last=%s, first=%s, middle=%s, id=%d",
+                last, first, middle, ids[0])
     return ids[0]
 
 
+def fetch_page(id_num: int, cache_dir: Optional[str] = None, refresh: bool = False) -> str:
+    """Return the MGP record page for the given primary key.
+
+    If cache_dir is given, the page is read from the cache when present
+    (unless refresh is set) and stored there after downloading.
+    """
+    url = "https://genealogy.math.ndsu.nodak.edu/id.php?id=%d" % id_num
+
+    def download():
+        RATE_LIMITER.wait()
+        with SESSION.get(url, verify=False, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            # Raise on error pages so they are never cached as record pages.
+            response.raise_for_status()
+            return read_until_students(response)
+
+    return fetch_cached(cache_path(cache_dir, "%d.html.gz" % id_num), refresh, download)
+
+
+def cache_path(cache_dir: Optional[str], filename: str) -> Optional[str]:
+    """Locate a cache entry, or return None if caching is disabled."""
+    if cache_dir is None:
+        return None
+    return os.path.join(cache_dir, filename)
+
+
+def fetch_cached(path: Optional[str], refresh: bool, download: Callable[[], str]) -> str:
+    """Return the page cached at path, or download it and store it there.
+
+    A path of None disables the cache; with refresh set, the page is always
+    downloaded and the cache entry replaced.
+    """
+    if path is not None and not refresh:
+        text = read_cached_page(path)
+        if text is not None:
+            return text
+
+    text = download()
+    if path is not None:
+        write_cached_page(path, text)
+    return text
+
+
+def read_until_students(response: requests.Response) -> str:
+    """Return a streamed record page, truncated once its list of students begins.
+
+    Nothing past the students is ever parsed, so that part of the body is
+    drained without being kept, leaving the connection free for reuse.
+    """
+    if response.encoding is None:
+        response.encoding = "utf8"
+    chunks = response.iter_content(chunk_size=8192, decode_unicode=True)
+
+    text = ""
+    advisor_at = -1
+    for chunk in chunks:
+        # Back up a little so that an anchor split across two chunks is still found.
+        resume = max(0, len(text) - len("Advisor"))
+        text += chunk
+        if advisor_at == -1:
+            advisor_at = text.find("Advisor", resume)
+        if advisor_at != -1 and text.find("Student", max(advisor_at, resume)) != -1:
+            break
+
+    for _ in chunks:
+        pass
+    return text
+
+
+def read_cached_page(path: str) -> Optional[str]:
+    """Load a gzipped page from the cache, or None if it is missing or unreadable."""
+    try:
+        with gzip.open(path, "rb") as cached:
+            return cached.read().decode("utf8")
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, UnicodeDecodeError):
+        logger.warning("Ignoring unreadable cache file %s", path)
+        return None
+
+
+def write_cached_page(path: str, text: str):
+    """Store a page in the cache, gzipped."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temporary name first so an interrupted scrape never leaves a truncated entry.
+    # The name is unique per process and thread, since several scrapes may share the cache.
+    tmp_path = "%s.%d.%d.tmp" % (path, os.getpid(), threading.get_ident())
+    with gzip.open(tmp_path, "wb") as cached:
+        cached.write(text.encode("utf8"))
+    os.replace(tmp_path, path)
+
+
 class Node:
     """Nodes record all data collected on a particular mathematician.
 
@@ -228,8 +508,11 @@ class Node:
 
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, id_number: int, gen: int, max_gen: int, node_data: dict):
-        node_data[id_number] = self
+    # A deep scrape creates thousands of nodes, so skip the per-instance __dict__.
+    __slots__ = ("id_num", "gen", "title", "name", "year_of_doctorate",
+                 "institution", "nationality", "advisor_ids")
+
+    def __init__(self, id_number: int, gen: int):
         self.id_num = id_number
         self.gen = gen
 
@@ -238,55 +521,85 @@ class Node:
         self.year_of_doctorate = ""
         self.institution = ""
         self.nationality = ""
-        self.advisors = set()
-
-        url = "https://genealogy.math.ndsu.nodak.edu/id.php?id=%d" % id_number
-        text = requests.get(url, verify=False).text
-
-        self.extract_personal_data(text)
-        logger.info("Recovered record: %s %s %s %s",
-                    self.name, self.title, self.institution, self.year_of_doctorate)
+        # Advisors are kept as MGP keys rather than Node references, so records
+        # never form an object graph and serialize independently of one another.
+        self.advisor_ids = []
+
+    def __getstate__(self):
+        # A flat tuple avoids storing the attribute names of each instance.
+        return (self.id_num, self.gen, self.title, self.name, self.year_of_doctorate,
+                self.institution, self.nationality, tuple(self.advisor_ids))
+
+    def __setstate__(self, state):
+        (self.id_num, self.gen, self.title, self.name, self.year_of_doctorate,
+         self.institution, self.nationality, advisor_ids) = state
+        self.advisor_ids = list(advisor_ids)
+
+    def to_dict(self) -> dict:
+        """Describe this record with plain JSON types, for saving to a database."""
+        return {
+            "id": self.id_num,
+            "gen": self.gen,
+            "title": self.title,
+            "name": self.name,
+            "year_of_doctorate": self.year_of_doctorate,
+            "institution": self.institution,
+            "nationality": self.nationality,
+            "advisors": self.advisor_ids
+        }
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "Node":
+        """Rebuild a record from the output of to_dict."""
+        node = cls(record["id"], record["gen"])
+        node.title = sys.intern(record["title"])
+        node.name = record["name"]
+        node.year_of_doctorate = sys.intern(record["year_of_doctorate"])
+        node.institution = sys.intern(record["institution"])
+        node.nationality = sys.intern(record["nationality"])
+        node.advisor_ids = list(record["advisors"])
+        return node
 
-        if gen >= max_gen:
-            return
+    def extract_personal_data(self, text):
+        """Search the input web page text for bio data.
 
-        txt_start = text.find("Advisor")
-        if txt_start == -1:
-            logger.error("Failed to find advisor. id=%s, name=%s",
-                         self.id_num, self.name)
-            return
+        Titles, institutions and years repeat across many records, so those
+        strings are interned and shared between nodes.
+        """
 
-        txt_stop = text.find("Student")
-        adv_text = text[txt_start: txt_stop]
+        # Only the first occurrence of each field is used, so stop scanning there.
+        match = RE_TITLE.search(text)
+        if match:
+            self.name = match.group(1)
 
-        advs = [int(id_string)
-                for id_string in re.findall(r"id.php\?id=(\d+)", adv_text)]
+        match = RE_SPAN_TITLE.search(text)
+        if match:
+            self.title = sys.intern(match.group(1))
 
-        for adv in advs:
-            if adv in node_data:
-                self.advised_by(node_data[adv])
-            else:
-                advisor = Node(adv, gen + 1, max_gen, node_data)
-                self.advised_by(advisor)
+        match = RE_INST_YEAR.search(text)
+        if match:
+            institution, year_of_doctorate = match.groups()
+            self.institution = sys.intern(institution)
+            self.year_of_doctorate = sys.intern(year_of_doctorate)
 
-    def extract_personal_data(self, text):
-        """Search the input web page text for bio data."""
+    def extract_advisor_ids(self, text) -> List[int]:
+        """Search the input web page text for the MGP keys of this record's advisors."""
 
-        results = re.findall(r"<title>(.+) - The Mathematics Genealogy Project</title>", text)
-        if results:
-            self.name = results[0]
+        _, found, tail = text.partition("Advisor")
+        if not found:
+            logger.error("Failed to find advisor. id=%s, name=%s",
+                         self.id_num, self.name)
+            return []
 
-        results = re.findall(r'<span style="margin-right: 0.5em">(.+)<span style=', text)
-        if results:
-            self.title = results[0]
+        adv_text, _, _ = tail.partition("Student")
 
-        results = re.findall(r'margin-left: 0.5em">(.+)</span>(.+)</span>', text)
-        if results:
-            self.institution, self.year_of_doctorate = results[0]
+        return [int(id_string)
+                for id_string in RE_ADVISOR_ID.findall(adv_text)]
 
     def advised_by(self, other_node):
         """Record an advisor-advisee relationship with another node."""
-        self.advisors.add(other_node)
+        if other_node.id_num not in self.advisor_ids:
+            self.advisor_ids.append(other_node.id_num)
 
     def dot_string(self, print_advs, brief=True):
         """Emit a dot description for this record."""
@@ -299,8 +612,8 @@ class Node:
             node_str = "node%d[label=\"%s\\n%s\\n%s\"];\n" % \
                        (self.id_num, self.name, institute, self.year_of_doctorate)
         if print_advs:
-            for adv in self.advisors:
-                node_str += "node%d->node%d;\n" % (adv.id_num, self.id_num)
+            node_str += "".join("node%d->node%d;\n" % (adv, self.id_num)
+                                for adv in self.advisor_ids)
 
         return node_str
 